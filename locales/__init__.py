@@ -16,11 +16,29 @@ DEFAULT_LANGUAGE = 'ru'
 _current_language = DEFAULT_LANGUAGE
 
 
+def _split_messages(messages: dict) -> tuple:
+    """Splits messages into plain strings and templates with placeholders."""
+    plain = {k: v for k, v in messages.items() if '{' not in v}
+    templated = {k: v for k, v in messages.items() if '{' in v}
+    return plain, templated
+
+
+# Messages of every language with missing keys taken from the default language
+_resolved = {
+    lang: {**LANGUAGES[DEFAULT_LANGUAGE], **messages}
+    for lang, messages in LANGUAGES.items()
+}
+
+# Messages of the current language, split once per language change
+_plain_messages, _templated_messages = _split_messages(_resolved[DEFAULT_LANGUAGE])
+
+
 def set_language(lang: str) -> bool:
     """Sets the current language. Returns True on success."""
-    global _current_language
+    global _current_language, _plain_messages, _templated_messages
     if lang in LANGUAGES:
         _current_language = lang
+        _plain_messages, _templated_messages = _split_messages(_resolved[lang])
         return True
     return False
 
@@ -40,11 +58,18 @@ def t(key: str, **kwargs) -> str:
     Returns a localized string by key.
     Supports formatting via kwargs.
     """
-    messages = LANGUAGES.get(_current_language, LANGUAGES[DEFAULT_LANGUAGE])
-    text = messages.get(key, key)
-    if kwargs:
-        try:
-            return text.format(**kwargs)
-        except KeyError:
-            return text
-    return text
+    # Strings without placeholders are returned as is
+    text = _plain_messages.get(key)
+    if text is not None:
+        return text
+    
+    text = _templated_messages.get(key)
+    if text is None:
+        return key
+    if not kwargs:
+        return text
+    
+    try:
+        return text.format(**kwargs)
+    except KeyError:
+        return text
@@ -6,11 +6,13 @@ Supports voice selection (male/female), trims silence at the end to 0.02 seconds
 
 import argparse
 import asyncio
+import json
+import os
+import subprocess
+from concurrent.futures import Executor, ThreadPoolExecutor
 from pathlib import Path
 
 import edge_tts
-from pydub import AudioSegment
-from pydub.silence import detect_silence
 
 
 VOICES = {
@@ -19,35 +21,49 @@ VOICES = {
 }
 SILENCE_TAIL_MS = 20  # Keep 0.02 seconds of silence at the end
 SILENCE_THRESHOLD = -40
+DEFAULT_JOBS = 8  # Concurrent edge-tts requests
 
+# ffmpeg codec options for output formats, wav is uncompressed and the game reads it without ffmpeg
+AUDIO_CODECS = {
+    "mp3": ["-c:a", "libmp3lame", "-q:a", "2"],
+    "wav": ["-c:a", "pcm_s16le"],
+}
+DEFAULT_FORMAT = "mp3"
+
+# Manifest in the raw directory: {output file name: its mtime right after trimming}
+TRIM_MANIFEST = "trimmed.json"
 
-def trim_silence(audio: AudioSegment, tail_ms: int = SILENCE_TAIL_MS, threshold: int = SILENCE_THRESHOLD) -> AudioSegment:
+
+def trim_silence(input_path: Path, output_path: Path, tail_ms: int = SILENCE_TAIL_MS, threshold: int = SILENCE_THRESHOLD) -> None:
     """
     Trims the long silence tail at the end of audio, keeping tail_ms milliseconds.
+    Runs as a single ffmpeg pass: the audio is reversed so the tail becomes
+    leading silence for silenceremove, then reversed back.
+    Input and output may be the same file, output format follows its suffix.
     """
-    # Use min_silence_len=100 to find real silence segments (like ffmpeg with d=0.1)
-    silence_ranges = detect_silence(audio, min_silence_len=100, silence_thresh=threshold)
-    
-    if not silence_ranges:
-        return audio
-    
-    # Check if there is silence at the end
-    last_silence_start, last_silence_end = silence_ranges[-1]
-    audio_length = len(audio)
-    
-    # If the last silence segment ends at the end of audio
-    if last_silence_end >= audio_length - 10:  # 10 ms tolerance
-        silence_duration = last_silence_end - last_silence_start
-        
-        if silence_duration > tail_ms:
-            # Trim to silence start + tail_ms
-            trim_point = last_silence_start + tail_ms
-            return audio[:trim_point]
-    
-    return audio
+    # ffmpeg can't write into its own input, so trim into a temporary file first
+    temp_path = output_path.with_name(f"{output_path.stem}.tmp{output_path.suffix}")
+    try:
+        subprocess.run(
+            [
+                "ffmpeg", "-nostdin", "-y", "-hide_banner", "-loglevel", "error",
+                "-i", str(input_path),
+                "-af", (
+                    "areverse,"
+                    f"silenceremove=start_periods=1:start_threshold={threshold}dB:start_silence={tail_ms / 1000:.3f},"
+                    "areverse"
+                ),
+                *AUDIO_CODECS[output_path.suffix.lstrip(".")],
+                str(temp_path)
+            ],
+            capture_output=True, check=True
+        )
+        temp_path.replace(output_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
 
 
-async def generate_audio(text: str, output_path: Path, raw_dir: Path, voice: str) -> bool:
+async def generate_audio(text: str, output_path: Path, raw_dir: Path, voice: str, semaphore: asyncio.Semaphore, pool: Executor) -> bool:
     """
     Generates an audio file for the given text using edge-tts.
     Saves raw file to raw_dir, trimmed file to output_path.
@@ -58,15 +74,13 @@ async def generate_audio(text: str, output_path: Path, raw_dir: Path, voice: str
         # Path for raw (untrimmed) file
         raw_path = raw_dir / f"{text}.mp3"
         
-        # Save raw file from edge-tts
-        await communicate.save(str(raw_path))
-        
-        # Load audio and trim silence
-        audio = AudioSegment.from_mp3(str(raw_path))
-        trimmed_audio = trim_silence(audio)
+        # Save raw file from edge-tts, only downloads are limited by the semaphore
+        async with semaphore:
+            await communicate.save(str(raw_path))
         
-        # Save trimmed result
-        trimmed_audio.export(output_path, format="mp3")
+        # Trim silence in the pool while the next downloads are already running
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(pool, trim_silence, raw_path, output_path)
         
         return True
     except Exception as e:
@@ -79,16 +93,86 @@ def trim_existing_file(file_path: Path) -> bool:
     Trims silence in an existing audio file.
     """
     try:
-        audio = AudioSegment.from_mp3(file_path)
-        trimmed_audio = trim_silence(audio)
-        trimmed_audio.export(file_path, format="mp3")
+        trim_silence(file_path, file_path)
         return True
     except Exception as e:
         print(f"Error trimming silence in '{file_path}': {e}")
         return False
 
 
-async def process_file(input_file: Path, output_dir: Path, gender: str) -> None:
+def load_manifest(raw_dir: Path) -> dict:
+    """
+    Loads the manifest of trimmed files, empty if there is none.
+    """
+    try:
+        with open(raw_dir / TRIM_MANIFEST, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(raw_dir: Path, manifest: dict) -> None:
+    """
+    Saves the manifest of trimmed files.
+    """
+    temp_path = raw_dir / f"{TRIM_MANIFEST}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    temp_path.replace(raw_dir / TRIM_MANIFEST)
+
+
+def is_trimmed(output_path: Path, manifest: dict) -> bool:
+    """
+    Checks that the file was trimmed and hasn't changed since.
+    """
+    mtime = manifest.get(output_path.name)
+    if mtime is None:
+        return False
+    try:
+        return output_path.stat().st_mtime_ns == mtime
+    except OSError:
+        return False
+
+
+async def process_word(word: str, gender_output_dir: Path, raw_dir: Path, voice: str, audio_format: str, semaphore: asyncio.Semaphore, pool: Executor, manifest: dict, force: bool = False) -> str:
+    """
+    Processes a single word/number, records trimmed output in the manifest.
+    Returns a status line for the progress output.
+    """
+    output_path = gender_output_dir / f"{word}.{audio_format}"
+    raw_path = raw_dir / f"{word}.mp3"
+    loop = asyncio.get_running_loop()
+    
+    # Already trimmed on a previous run - nothing to do unless forced
+    if not force and is_trimmed(output_path, manifest):
+        return f"✓ Already trimmed: {output_path}"
+    
+    # Priority check: 1) raw file, 2) trimmed file, 3) generate new
+    if raw_path.exists():
+        # Raw file exists - trim it and save to output
+        try:
+            await loop.run_in_executor(pool, trim_silence, raw_path, output_path)
+            status = f"✓ Trimmed from raw: {output_path}"
+        except Exception as e:
+            return f"✗ Error trimming raw file: {e}"
+    elif output_path.exists():
+        # No raw file, but trimmed exists - re-trim it
+        success = await loop.run_in_executor(pool, trim_existing_file, output_path)
+        if not success:
+            return f"✗ Error trimming silence: {word}"
+        status = f"✓ Silence trimmed: {output_path}"
+    else:
+        # No raw or trimmed file - generate new
+        success = await generate_audio(word, output_path, raw_dir, voice, semaphore, pool)
+        if not success:
+            return f"✗ Error processing: {word}"
+        status = f"✓ Saved: {output_path}"
+    
+    manifest[output_path.name] = output_path.stat().st_mtime_ns
+    return status
+
+
+async def process_file(input_file: Path, output_dir: Path, gender: str, jobs: int = DEFAULT_JOBS, audio_format: str = DEFAULT_FORMAT, force: bool = False) -> None:
     """
     Processes a file with a list of words/numbers.
     """
@@ -102,46 +186,32 @@ async def process_file(input_file: Path, output_dir: Path, gender: str) -> None:
     raw_dir = output_dir / "raw" / gender
     raw_dir.mkdir(parents=True, exist_ok=True)
     
-    # Read words from file
+    # Read words from file, a repeated word would make two tasks write the same files
     with open(input_file, "r", encoding="utf-8") as f:
-        words = [line.strip() for line in f if line.strip()]
+        words = list(dict.fromkeys(line.strip() for line in f if line.strip()))
     
     print(f"Voice: {gender} ({voice})")
     print(f"Found {len(words)} words/numbers to process")
     print(f"Raw files saved to: {raw_dir}")
     
-    for i, word in enumerate(words, 1):
-        output_path = gender_output_dir / f"{word}.mp3"
-        raw_path = raw_dir / f"{word}.mp3"
-        print(f"[{i}/{len(words)}] Processing: {word}")
-        
-        # Priority check: 1) raw file, 2) trimmed file, 3) generate new
-        if raw_path.exists():
-            # Raw file exists - trim it and save to output
-            print(f"  → Found raw file, trimming silence...")
-            try:
-                audio = AudioSegment.from_mp3(raw_path)
-                trimmed_audio = trim_silence(audio)
-                trimmed_audio.export(output_path, format="mp3")
-                print(f"  ✓ Trimmed from raw: {output_path}")
-            except Exception as e:
-                print(f"  ✗ Error trimming raw file: {e}")
-        elif output_path.exists():
-            # No raw file, but trimmed exists - re-trim it
-            print(f"  → File already exists, trimming silence...")
-            success = trim_existing_file(output_path)
-            if success:
-                print(f"  ✓ Silence trimmed: {output_path}")
-            else:
-                print(f"  ✗ Error trimming silence: {word}")
-        else:
-            # No raw or trimmed file - generate new
-            success = await generate_audio(word, output_path, raw_dir, voice)
-            
-            if success:
-                print(f"  ✓ Saved: {output_path}")
-            else:
-                print(f"  ✗ Error processing: {word}")
+    # Files trimmed on previous runs are skipped unless forced,
+    # the manifest is still loaded so entries of other files survive a forced run
+    manifest = load_manifest(raw_dir)
+    
+    # Downloads are network-bound and limited by the semaphore,
+    # trimming runs ffmpeg in the pool so both stages overlap
+    semaphore = asyncio.Semaphore(jobs)
+    try:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            tasks = [
+                process_word(word, gender_output_dir, raw_dir, voice, audio_format, semaphore, pool, manifest, force)
+                for word in words
+            ]
+            for i, task in enumerate(asyncio.as_completed(tasks), 1):
+                status = await task
+                print(f"[{i}/{len(words)}] {status}")
+    finally:
+        save_manifest(raw_dir, manifest)
     
     print(f"\nDone! Files saved to {gender_output_dir}")
     print(f"Raw files: {raw_dir}")
@@ -154,6 +224,7 @@ def main():
     parser.add_argument(
         "input_file",
         type=Path,
+        nargs="?",
         help="Path to file with words/numbers (one per line)"
     )
     parser.add_argument(
@@ -168,19 +239,60 @@ def main():
         default="male",
         help="Voice gender: male (default), female, or all (both)"
     )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Number of concurrent edge-tts downloads (default: {DEFAULT_JOBS})"
+    )
+    parser.add_argument(
+        "-f", "--format",
+        choices=list(AUDIO_CODECS),
+        default=DEFAULT_FORMAT,
+        help="Format of trimmed files: mp3 (default) or wav (uncompressed, read by the game without ffmpeg)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Trim again files that were already trimmed on previous runs"
+    )
+    parser.add_argument(
+        "--precompute-pcm",
+        action="store_true",
+        help="Decode all clips of the voice into a PCM cache, so the game starts without decoding"
+    )
     
     args = parser.parse_args()
     
-    if not args.input_file.exists():
+    if args.input_file is None and not args.precompute_pcm:
+        parser.error("input_file is required unless --precompute-pcm is given")
+    
+    if args.input_file is not None and not args.input_file.exists():
         print(f"Error: file '{args.input_file}' not found")
         return 1
     
-    if args.gender == "all":
-        for gender in ["male", "female"]:
-            asyncio.run(process_file(args.input_file, args.output, gender))
+    if args.jobs < 1:
+        print(f"Error: --jobs ({args.jobs}) must be at least 1")
+        return 1
+    
+    genders = ["male", "female"] if args.gender == "all" else [args.gender]
+    
+    if args.input_file is not None:
+        for gender in genders:
+            asyncio.run(process_file(args.input_file, args.output, gender, args.jobs, args.format, args.force))
             print()  # Empty line between voices
-    else:
-        asyncio.run(process_file(args.input_file, args.output, args.gender))
+    
+    if args.precompute_pcm:
+        # The cache format belongs to the game, import it only when needed
+        from number_game import build_pcm_cache
+        
+        for gender in genders:
+            gender_output_dir = args.output / gender
+            if not gender_output_dir.is_dir():
+                print(f"Error: directory '{gender_output_dir}' not found")
+                return 1
+            count = build_pcm_cache(str(gender_output_dir))
+            print(f"PCM cache: {count} clips saved to {gender_output_dir}")
     return 0
 
 
@@ -1,125 +1,421 @@
 import random
 import os
+import json
+import mmap
 import subprocess
 import sys
-import select
+import selectors
 import termios
 import tty
 import threading
+import time
+import atexit
+import wave
 import argparse
-from tempfile import NamedTemporaryFile
-from pydub import AudioSegment
+from collections import Counter
+from functools import lru_cache
 from locales import t, set_language, get_available_languages
 
+try:
+    import sounddevice
+except (ImportError, OSError):
+    # Not installed or PortAudio is missing - fall back to ffplay
+    sounddevice = None
+
 AUDIO_BASE_DIR = "./audio"
+AUDIO_EXTENSIONS = ["wav", "mp3"]  # By preference, wav in DECODE_FORMAT is read without ffmpeg
 AVAILABLE_VOICES = ["female", "male"]
 DEFAULT_MIN = 0
 DEFAULT_MAX = 1999
+# Raw PCM sample formats by sample width in bytes
+FFMPEG_SAMPLE_FORMATS = {1: "u8", 2: "s16le", 3: "s24le", 4: "s32le"}
+SOUNDDEVICE_DTYPES = {1: "uint8", 2: "int16", 3: "int24", 4: "int32"}
+# ffmpeg decodes every clip into this (frame_rate, channels, sample_width) format,
+# so clips can always be joined; it is what edge-tts produces
+DECODE_FORMAT = (24000, 1, 2)
+PLAYER_PADDING_MS = 100  # Silence after each clip pushes its tail through ffplay's buffers
+PCM_CACHE_FILE = "pcm_cache.bin"  # Decoded clips of a voice, one after another
+PCM_INDEX_FILE = "pcm_cache.json"  # Format and {file name: [offset, length, mtime]}
+# Chances of random decisions in generate_number_with_errors, out of 16 bits
+CHANCE_30 = (1 << 16) * 3 // 10
+CHANCE_50 = (1 << 16) // 2
+CHANCE_70 = (1 << 16) * 7 // 10
+STATS_FILE = "./.number_game_stats.json"  # Error statistics kept between sessions
+STATS_SAVE_INTERVAL = 20  # Rounds between saves, so a crash loses little
 
 
-def play_audio_async(seg, done_event):
-    """Plays audio without console output in a separate thread."""
-    with NamedTemporaryFile("w+b", suffix=".wav", delete=False) as f:
-        temp_path = f.name
-        seg.export(f.name, "wav")
-    try:
-        subprocess.call(
-            ["ffplay", "-nodisp", "-autoexit", "-hide_banner", "-loglevel", "quiet", temp_path]
+# Long-lived ffplay fed with raw PCM and the (frame_rate, channels, sample_width) it was started for
+_player = None
+_player_format = None
+
+
+def _get_player(audio_format):
+    """Returns the ffplay process for the (frame_rate, channels, sample_width) format, starting it if needed."""
+    global _player, _player_format
+    if _player is None or _player.poll() is not None or _player_format != audio_format:
+        stop_player()
+        frame_rate, channels, sample_width = audio_format
+        # The format is given explicitly, so probing and input buffering are turned off
+        _player = subprocess.Popen(
+            [
+                "ffplay", "-nodisp", "-autoexit", "-hide_banner", "-loglevel", "quiet",
+                "-fflags", "nobuffer", "-flags", "low_delay",
+                "-probesize", "32", "-analyzeduration", "0",
+                "-f", FFMPEG_SAMPLE_FORMATS[sample_width],
+                "-ar", str(frame_rate), "-ac", str(channels),
+                "-i", "pipe:0"
+            ],
+            stdin=subprocess.PIPE
         )
-    finally:
-        os.unlink(temp_path)
-        done_event.set()
+        _player_format = audio_format
+    return _player
+
 
+def stop_player():
+    """Closes ffplay input and waits for it to play the rest and exit."""
+    global _player
+    if _player is not None:
+        try:
+            _player.stdin.close()
+        except BrokenPipeError:
+            pass
+        _player.wait()
+        _player = None
 
-def read_input_during_playback(seg):
+
+def play_audio_async(audio):
+    """
+    Plays audio without console output in a separate thread.
+    audio is a (pcm, (frame_rate, channels, sample_width)) pair.
+    Returns when the audio has finished playing.
+    """
+    global sounddevice
+    pcm, audio_format = audio
+    if not pcm:
+        return
+    frame_rate, channels, sample_width = audio_format
+    
+    if sounddevice is not None:
+        # Play in-process from memory, no player process to launch
+        try:
+            with sounddevice.RawOutputStream(
+                samplerate=frame_rate, channels=channels,
+                dtype=SOUNDDEVICE_DTYPES[sample_width]
+            ) as stream:
+                stream.write(pcm)
+            return
+        except sounddevice.PortAudioError:
+            # PortAudio is installed but has no usable output device,
+            # use ffplay from now on
+            sounddevice = None
+    
+    # Raw PCM is written into one ffplay for the whole session, no process launch per playback
+    silence_byte = b"\x80" if sample_width == 1 else b"\x00"  # u8 silence is the midpoint
+    padding_frames = frame_rate * PLAYER_PADDING_MS // 1000
+    padding = silence_byte * (padding_frames * channels * sample_width)
+    
+    player = _get_player(audio_format)
+    player.stdin.write(pcm + padding)
+    player.stdin.flush()
+    # Timed from here, starting ffplay for the first clip is not playback time
+    start = time.monotonic()
+    
+    # ffplay doesn't report the end of a clip, so wait until it has played out
+    duration = len(pcm) / (frame_rate * channels * sample_width) + PLAYER_PADDING_MS / 1000
+    remaining = start + duration - time.monotonic()
+    if remaining > 0:
+        time.sleep(remaining)
+
+
+@lru_cache(maxsize=None)
+def _terminal_modes(fd):
+    """
+    Returns the (cooked, raw) terminal attributes of fd, read once per run
+    so switching modes each round is a single tcsetattr.
+    """
+    cooked = termios.tcgetattr(fd)
+    tty.setraw(fd, termios.TCSANOW)
+    raw = termios.tcgetattr(fd)
+    termios.tcsetattr(fd, termios.TCSANOW, cooked)
+    return cooked, raw
+
+
+def read_input_during_playback(audio):
     """
     Plays audio and reads keyboard input in parallel.
     Returns buffer of entered characters.
     """
     buffer = []
-    done_event = threading.Event()
+    
+    # Self-pipe: the playback thread writes a byte when it is done,
+    # so waiting for input needs no timeout
+    wake_r, wake_w = os.pipe()
+    
+    def playback():
+        try:
+            play_audio_async(audio)
+        finally:
+            os.write(wake_w, b"\0")
     
     # Start playback in a separate thread
-    play_thread = threading.Thread(target=play_audio_async, args=(seg, done_event))
+    play_thread = threading.Thread(target=playback)
     play_thread.start()
     
-    # Save terminal settings
     fd = sys.stdin.fileno()
-    old_settings = termios.tcgetattr(fd)
+    cooked_mode, raw_mode = _terminal_modes(fd)
+    
+    # Register stdin and the wake-up pipe once instead of rebuilding the fd set on every wait
+    selector = selectors.DefaultSelector()
+    selector.register(fd, selectors.EVENT_READ)
+    selector.register(wake_r, selectors.EVENT_READ)
     
     try:
         # Switch terminal to raw mode for reading individual characters
-        tty.setraw(fd)
+        termios.tcsetattr(fd, termios.TCSANOW, raw_mode)
         
-        while not done_event.is_set():
-            # Check if there is data to read (0.1 sec timeout)
-            if select.select([sys.stdin], [], [], 0.1)[0]:
-                char = sys.stdin.read(1)
-                if char:
-                    buffer.append(char)
+        playing = True
+        while playing:
+            # Block until a key is pressed or playback ends
+            for key, _ in selector.select():
+                if key.fd == wake_r:
+                    playing = False
+                    continue
+                # Take everything typed so far in one read
+                data = os.read(fd, 1024)
+                if data:
+                    buffer.append(data.decode(errors="ignore"))
+                else:
+                    # End of input, just wait for playback
+                    selector.unregister(fd)
     finally:
-        # Restore terminal settings
-        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+        selector.close()
+        # Back to cooked mode, nothing was written while raw so there is no output to drain
+        termios.tcsetattr(fd, termios.TCSANOW, cooked_mode)
     
     play_thread.join()
+    os.close(wake_r)
+    os.close(wake_w)
     return ''.join(buffer)
 
 
-def get_audio_files_for_number(number, audio_dir):
+@lru_cache(maxsize=None)
+def _path_exists(path):
+    """Checks a path once per run, clips don't change while the game is running."""
+    return os.path.exists(path)
+
+
+def _audio_path(audio_dir, value):
+    """Returns the path of the clip for a value in the first available format."""
+    for extension in AUDIO_EXTENSIONS:
+        path = os.path.join(audio_dir, f"{value}.{extension}")
+        if _path_exists(path):
+            return path
+    return os.path.join(audio_dir, f"{value}.{AUDIO_EXTENSIONS[-1]}")
+
+
+def _split_audio_files(number, audio_dir):
     """
-    Splits a number into components and returns a list of files to play.
+    Returns a list of files to play for a number: its own clip if there is one,
+    otherwise clips of its components.
     Example: 134 -> [100.mp3, 30.mp3, 4.mp3]
              1234 -> [1000.mp3, 200.mp3, 30.mp3, 4.mp3]
     """
-    files = []
-    
-    exact_file = os.path.join(audio_dir, f"{number}.mp3")
-    if os.path.exists(exact_file):
+    exact_file = _audio_path(audio_dir, number)
+    if _path_exists(exact_file):
         return [exact_file]
     
-    if number >= 1000:
-        thousands = (number // 1000) * 1000
-        files.append(os.path.join(audio_dir, f"{thousands}.mp3"))
-        number = number % 1000
+    return [_audio_path(audio_dir, component) for component in get_number_components(number)]
+
+
+@lru_cache(maxsize=None)
+def _audio_file_exists(path):
+    """Checks a file once per run, reporting it if it is missing."""
+    if _path_exists(path):
+        return True
+    print(t("file_not_found", file=path))
+    return False
+
+
+@lru_cache(maxsize=2048)
+def get_audio_files_for_number(number, audio_dir):
+    """Returns a tuple of existing files to play for a number, computed once per number."""
+    return tuple(f for f in _split_audio_files(number, audio_dir) if _audio_file_exists(f))
+
+
+# {audio_dir: PCM cache index with mmapped "data"}, filled by load_pcm_cache()
+_pcm_caches = {}
+
+
+def _read_wav(path):
+    """Returns the PCM of a WAV file that is already in DECODE_FORMAT, None if it has to be decoded."""
+    try:
+        with wave.open(path, "rb") as f:
+            if (f.getframerate(), f.getnchannels(), f.getsampwidth()) != DECODE_FORMAT:
+                return None
+            return f.readframes(f.getnframes())
+    except (wave.Error, EOFError):
+        # Not plain PCM WAV, ffmpeg can still read it
+        return None
+
+
+def _decode(path):
+    """
+    Decodes an audio file into raw PCM of DECODE_FORMAT with ffmpeg,
+    WAV files already in that format are read as they are.
+    ffmpeg is kept away from the terminal, it runs while the game switches its modes.
+    """
+    if path.endswith(".wav"):
+        pcm = _read_wav(path)
+        if pcm is not None:
+            return pcm
+    
+    frame_rate, channels, sample_width = DECODE_FORMAT
+    result = subprocess.run(
+        [
+            "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error", "-i", path,
+            "-f", FFMPEG_SAMPLE_FORMATS[sample_width],
+            "-ar", str(frame_rate), "-ac", str(channels),
+            "pipe:1"
+        ],
+        stdin=subprocess.DEVNULL, capture_output=True, check=True
+    )
+    return result.stdout
+
+
+def build_pcm_cache(audio_dir):
+    """
+    Decodes every clip of the directory into a single raw PCM file with a JSON index,
+    so the game can start without decoding anything.
+    Returns the number of cached clips.
+    """
+    # One clip per value, in the preferred format
+    clips = {}
+    for name in sorted(os.listdir(audio_dir)):
+        value, extension = os.path.splitext(name)
+        if value.isdigit() and extension[1:] in AUDIO_EXTENSIONS:
+            path = _audio_path(audio_dir, value)
+            clips[os.path.basename(path)] = path
+    
+    frame_rate, channels, sample_width = DECODE_FORMAT
+    index = {"frame_rate": frame_rate, "channels": channels, "sample_width": sample_width, "clips": {}}
+    data_path = os.path.join(audio_dir, PCM_CACHE_FILE)
+    index_path = os.path.join(audio_dir, PCM_INDEX_FILE)
+    
+    # Write to temporary files so a running game never sees a half-written cache
+    with open(data_path + ".tmp", "wb") as f:
+        offset = 0
+        for name, path in clips.items():
+            pcm = _decode(path)
+            f.write(pcm)
+            index["clips"][name] = [offset, len(pcm), os.stat(path).st_mtime_ns]
+            offset += len(pcm)
+    with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    
+    os.replace(data_path + ".tmp", data_path)
+    os.replace(index_path + ".tmp", index_path)
+    return len(clips)
+
+
+def load_pcm_cache(audio_dir):
+    """Maps the PCM cache of the directory into memory. Returns True if it exists."""
+    try:
+        with open(os.path.join(audio_dir, PCM_INDEX_FILE), encoding="utf-8") as f:
+            index = json.load(f)
+        index["format"] = (index["frame_rate"], index["channels"], index["sample_width"])
+    except (OSError, ValueError, KeyError, TypeError):
+        # No index or a broken one
+        return False
+    if not isinstance(index.get("clips"), dict):
+        return False
+    if index["format"] != DECODE_FORMAT:
+        # Built for another format, its clips couldn't be joined with decoded ones
+        return False
+    try:
+        with open(os.path.join(audio_dir, PCM_CACHE_FILE), "rb") as f:
+            index["data"] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # No cache data or an empty file
+        return False
+    
+    # Entries that don't point inside the data are dropped, their clips are decoded as usual
+    size = len(index["data"])
+    index["clips"] = {
+        name: entry for name, entry in index["clips"].items()
+        if isinstance(entry, list) and len(entry) == 3
+        and all(type(field) is int for field in entry)
+        and 0 <= entry[0] and 0 <= entry[1] and entry[0] + entry[1] <= size
+    }
+    _pcm_caches[audio_dir] = index
+    return True
+
+
+@lru_cache(maxsize=None)
+def _load_clip(path):
+    """
+    Decodes an audio file once.
+    Returns its raw PCM and (frame_rate, channels, sample_width) format.
+    """
+    cache = _pcm_caches.get(os.path.dirname(path))
+    entry = cache["clips"].get(os.path.basename(path)) if cache else None
     
-    if number >= 100:
-        hundreds = (number // 100) * 100
-        files.append(os.path.join(audio_dir, f"{hundreds}.mp3"))
-        number = number % 100
+    # Cached PCM is used only while the clip is unchanged since the cache was built
+    if entry is not None and entry[2] == os.stat(path).st_mtime_ns:
+        offset, length = entry[0], entry[1]
+        return cache["data"][offset:offset + length], cache["format"]
     
-    if number >= 20:
-        tens = (number // 10) * 10
-        files.append(os.path.join(audio_dir, f"{tens}.mp3"))
-        number = number % 10
+    return _decode(path), DECODE_FORMAT
+
+
+def preload_audio(audio_dir, min_val=DEFAULT_MIN, max_val=DEFAULT_MAX):
+    """
+    Builds the file table and decodes all audio files needed for numbers in the range
+    in a background thread, so the game starts without waiting for ffmpeg.
+    A clip needed before it is preloaded is simply decoded on the spot.
+    Returns the thread.
+    """
+    # Missing files are reported here, before the game starts
+    audio_files = dict.fromkeys(
+        audio_file
+        for number in range(min_val, max_val + 1)
+        for audio_file in get_audio_files_for_number(number, audio_dir)
+    )
     
-    if number > 0:
-        files.append(os.path.join(audio_dir, f"{number}.mp3"))
+    def decode_all():
+        for audio_file in audio_files:
+            _load_clip(audio_file)
     
-    return files
+    # ffmpeg runs as a subprocess, so the thread doesn't hold the GIL while waiting
+    thread = threading.Thread(target=decode_all, daemon=True)
+    thread.start()
+    return thread
 
 
 def get_audio_for_number(number, audio_dir):
-    """Returns AudioSegment for a number."""
-    files = get_audio_files_for_number(number, audio_dir)
-    
-    combined = AudioSegment.empty()
-    for audio_file in files:
-        if os.path.exists(audio_file):
-            segment = AudioSegment.from_mp3(audio_file)
-            combined += segment
-        else:
-            print(t("file_not_found", file=audio_file))
+    """
+    Returns (pcm, (frame_rate, channels, sample_width)) audio for a number.
+    Built on every call, only the clips are kept in memory.
+    """
+    clips = [_load_clip(audio_file) for audio_file in get_audio_files_for_number(number, audio_dir)]
+    if not clips:
+        return b"", None
     
-    return combined
+    # All clips of a voice share the same format, so raw PCM is joined in one copy
+    return b"".join(pcm for pcm, _ in clips), clips[0][1]
 
 
 def input_with_prefill(prompt, prefill):
     """Input with prefilled value."""
-    print(prompt + prefill, end='', flush=True)
+    # Earlier prints may still sit in the buffer, the prompt goes straight to the fd
+    sys.stdout.flush()
+    os.write(sys.stdout.fileno(), (prompt + prefill).encode())
     
     # Read additional input
-    additional = input()
-    return prefill + additional
+    line = sys.stdin.readline()
+    if not line:
+        # Same as input() at the end of input
+        raise EOFError
+    return prefill + line.rstrip("\n")
 
 
 def get_position_value(number, position):
@@ -127,46 +423,113 @@ def get_position_value(number, position):
     Returns the value at a position in a number.
     Example: for 1965, position 1 (tens) -> 60
     """
-    str_num = str(number)
-    length = len(str_num)
-    digit_index = length - 1 - position  # index from the end
-    if digit_index < 0 or digit_index >= length:
+    if position < 0:
+        return None
+    power = 10 ** position
+    if position > 0 and number < power:
         return None
-    digit = int(str_num[digit_index])
-    return digit * (10 ** position)
+    return number // power % 10 * power
 
 
+@lru_cache(maxsize=2048)
 def get_number_components(number):
     """
     Splits a number into components (thousands, hundreds, tens, units).
-    Example: 1234 -> [1000, 200, 30, 4]
-             237 -> [200, 30, 7]
+    Example: 1234 -> (1000, 200, 30, 4)
+             237 -> (200, 30, 7)
+    Cached, the game range has at most 2000 numbers.
     """
-    components = []
-    
-    if number >= 1000:
-        thousands = (number // 1000) * 1000
-        components.append(thousands)
-        number = number % 1000
-    
-    if number >= 100:
-        hundreds = (number // 100) * 100
-        components.append(hundreds)
-        number = number % 100
-    
-    if number >= 20:
-        tens = (number // 10) * 10
-        components.append(tens)
-        number = number % 10
-    elif number >= 11:
+    rest = number % 100
+    if 11 <= rest <= 19:
         # Numbers 11-19 as a single component
-        components.append(number)
-        number = 0
-    
-    if number > 0:
-        components.append(number)
+        parts = (number // 1000 * 1000, number % 1000 // 100 * 100, rest)
+    else:
+        parts = (number // 1000 * 1000, number % 1000 // 100 * 100, rest // 10 * 10, rest % 10)
+    return tuple(part for part in parts if part)
+
+
+def _error_category(value):
+    """Returns the component category of a position value, None if it has none."""
+    if value == 1000:
+        return "thousands"
+    if 100 <= value <= 900 and value % 100 == 0:
+        return "hundreds"
+    if 20 <= value <= 90 and value % 10 == 0:
+        return "tens"
+    if 11 <= value <= 19:
+        return "teens"
+    if 1 <= value <= 9:
+        return "units"
+    return None
+
+
+class ErrorStats(Counter):
+    """
+    Counter of misheard position values that keeps values with positive counts
+    grouped by category, so generating a number doesn't scan all of them.
+    """
     
-    return components
+    def __init__(self, *args, **kwargs):
+        self.positive = set()
+        self.thousands = []
+        self.hundreds = []
+        self.tens = []
+        self.teens = []
+        self.units = []
+        super().__init__(*args, **kwargs)
+    
+    def __setitem__(self, value, count):
+        was_positive = value in self.positive
+        super().__setitem__(value, count)
+        if (count > 0) != was_positive:
+            self._move(value, count > 0)
+    
+    def __delitem__(self, value):
+        super().__delitem__(value)
+        if value in self.positive:
+            self._move(value, False)
+    
+    def update(self, iterable=None, /, **kwargs):
+        # Counter fills an empty counter with dict.update, which skips __setitem__
+        for value, count in Counter(iterable, **kwargs).items():
+            self[value] += count
+    
+    # The dict methods below change items without __setitem__/__delitem__
+    
+    def pop(self, value, *default):
+        count = super().pop(value, *default)
+        if value in self.positive:
+            self._move(value, False)
+        return count
+    
+    def popitem(self):
+        value, count = super().popitem()
+        if value in self.positive:
+            self._move(value, False)
+        return value, count
+    
+    def setdefault(self, value, default=0):
+        if value not in self:
+            self[value] = default
+        return self[value]
+    
+    def clear(self):
+        super().clear()
+        self.positive.clear()
+        for category in (self.thousands, self.hundreds, self.tens, self.teens, self.units):
+            category.clear()
+    
+    def _move(self, value, positive):
+        """Adds a value that became positive to its category, removes it when it stops being."""
+        category = _error_category(value)
+        if positive:
+            self.positive.add(value)
+            if category:
+                getattr(self, category).append(value)
+        else:
+            self.positive.discard(value)
+            if category:
+                getattr(self, category).remove(value)
 
 
 def generate_number_with_errors(errors, min_val=DEFAULT_MIN, max_val=DEFAULT_MAX):
@@ -174,47 +537,50 @@ def generate_number_with_errors(errors, min_val=DEFAULT_MIN, max_val=DEFAULT_MAX
     Generates a number using components from error statistics.
     If no errors - generates a random number.
     """
-    # Filter only positive counters
-    positive_errors = {k: v for k, v in errors.items() if v > 0}
-    
-    if not positive_errors:
+    if not errors.positive:
         return random.randint(max(min_val, 0), max_val)
     
-    # Collect components by categories
-    thousands = [k for k in positive_errors if k == 1000]
-    hundreds = [k for k in positive_errors if 100 <= k <= 900 and k % 100 == 0]
-    tens = [k for k in positive_errors if 20 <= k <= 90 and k % 10 == 0]
-    teens = [k for k in positive_errors if 11 <= k <= 19]
-    units = [k for k in positive_errors if 1 <= k <= 9]
+    # Components by categories, kept up to date by ErrorStats
+    thousands = errors.thousands
+    hundreds = errors.hundreds
+    tens = errors.tens
+    teens = errors.teens
+    units = errors.units
+    
+    # One draw for the whole number, split into 16-bit random decisions
+    (use_thousands, plain_thousands, pick_thousands,
+     use_hundreds, plain_hundreds, pick_hundreds,
+     use_teens, use_tens, pick_tens,
+     use_units, plain_units, pick_units) = memoryview(random.getrandbits(192).to_bytes(24, "little")).cast("H")
     
     result = 0
     
     # Thousands (50% chance to use from errors if available)
-    if thousands and random.random() < 0.5:
-        result += random.choice(thousands)
-    elif random.random() < 0.3:
+    if thousands and use_thousands < CHANCE_50:
+        result += thousands[pick_thousands % len(thousands)]
+    elif plain_thousands < CHANCE_30:
         result += 1000
     
     # Hundreds (70% chance to use from errors if available)
-    if hundreds and random.random() < 0.7:
-        result += random.choice(hundreds)
-    elif random.random() < 0.5:
-        result += random.choice([100, 200, 300, 400, 500, 600, 700, 800, 900])
+    if hundreds and use_hundreds < CHANCE_70:
+        result += hundreds[pick_hundreds % len(hundreds)]
+    elif plain_hundreds < CHANCE_50:
+        result += (pick_hundreds % 9 + 1) * 100
     
     # Tens or teens (70% chance to use from errors)
-    if teens and random.random() < 0.7:
-        result += random.choice(teens)
-    elif tens and random.random() < 0.7:
-        result += random.choice(tens)
+    if teens and use_teens < CHANCE_70:
+        result += teens[pick_tens % len(teens)]
+    elif tens and use_tens < CHANCE_70:
+        result += tens[pick_tens % len(tens)]
         # Units
-        if units and random.random() < 0.7:
-            result += random.choice(units)
-        elif random.random() < 0.5:
-            result += random.randint(1, 9)
+        if units and use_units < CHANCE_70:
+            result += units[pick_units % len(units)]
+        elif plain_units < CHANCE_50:
+            result += pick_units % 9 + 1
     else:
         # Random tens/units
-        if random.random() < 0.5:
-            result += random.randint(1, 99)
+        if plain_units < CHANCE_50:
+            result += pick_units % 99 + 1
     
     # If result is 0 or out of range, generate a random number
     if result == 0 or result < min_val or result > max_val:
@@ -230,10 +596,59 @@ def decrement_errors_for_number(number, errors):
     """
     components = get_number_components(number)
     for comp in components:
-        if comp in errors and errors[comp] > 0:
+        if errors[comp] > 0:
             errors[comp] -= 1
 
 
+# Digits wrapped in red color codes, built once instead of per misheard digit
+_RED_DIGITS = {digit: f"\033[91m{digit}\033[0m" for digit in "0123456789"}
+
+
+def compare_guess(number, guess):
+    """
+    Compares a guess with the number digit by digit.
+    Returns the guess with incorrect digits highlighted in red
+    and the values from the number at misheard positions (zeros are skipped).
+    Example: 1965, 1975 -> ("19\\033[91m7\\033[0m5", [60])
+    """
+    guess_str = str(guess)
+    # Pad the number with zeros only if the guess is longer
+    correct_str = str(number).zfill(len(guess_str))
+    
+    # Walk both from the units up, the position comes from enumerate
+    parts = []
+    misheard = []
+    for position, (guess_char, correct_char) in enumerate(zip(reversed(guess_str), reversed(correct_str))):
+        if guess_char == correct_char:
+            parts.append(guess_char)
+        else:
+            # Red color for incorrect digit
+            parts.append(_RED_DIGITS[guess_char])
+            if correct_char != "0":  # Don't record zeros
+                misheard.append(int(correct_char) * 10 ** position)
+    
+    highlighted = "".join(reversed(parts))
+    return highlighted, misheard
+
+
+def load_errors(path=STATS_FILE):
+    """Loads error statistics of previous sessions, empty if there are none."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return ErrorStats({int(value): count for value, count in json.load(f).items()})
+    except (OSError, ValueError, AttributeError, TypeError):
+        # No file or a broken one, statistics start over
+        return ErrorStats()
+
+
+def save_errors(errors, path=STATS_FILE):
+    """Saves error statistics, a temporary file keeps the old ones intact if writing fails."""
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({str(value): count for value, count in errors.items()}, f)
+    os.replace(temp_path, path)
+
+
 def print_statistics(total, first_try, errors):
     """Prints game statistics."""
     print("\n" + "=" * 40)
@@ -243,10 +658,9 @@ def print_statistics(total, first_try, errors):
     print(t("first_try_correct", count=first_try))
     
     if errors:
-        # Sort errors by count (descending)
-        sorted_errors = sorted(errors.items(), key=lambda x: x[1], reverse=True)[:5]
+        # Top errors by count (descending)
         print("\n" + t("top_errors_header"))
-        for i, (pos_value, count) in enumerate(sorted_errors, 1):
+        for i, (pos_value, count) in enumerate(errors.most_common(5), 1):
             print(t("error_item", index=i, value=pos_value, count=count))
     print("=" * 40)
 
@@ -292,6 +706,18 @@ def main():
     # Directory with audio files for selected voice
     audio_dir = os.path.join(AUDIO_BASE_DIR, args.voice)
     
+    # Let the ffplay player finish and exit together with the game
+    atexit.register(stop_player)
+    
+    # However the game ends, leave the terminal in the mode it was started in
+    cooked_mode, _ = _terminal_modes(sys.stdin.fileno())
+    atexit.register(termios.tcsetattr, sys.stdin.fileno(), termios.TCSADRAIN, cooked_mode)
+    
+    # Decode audio once in the background so rounds don't wait for ffmpeg,
+    # clips found in the PCM cache are not decoded at all
+    load_pcm_cache(audio_dir)
+    preload_audio(audio_dir, args.min, args.max)
+    
     print(t("game_title"))
     print(t("game_description"))
     print("-" * 40)
@@ -299,16 +725,19 @@ def main():
     # Statistics
     total_numbers = 0
     first_try_correct = 0
-    errors = {}  # {position_value: count}
+    errors = load_errors()  # {position_value: count}, carried over from previous sessions
+    atexit.register(save_errors, errors)
     
     while True:
         number = generate_number_with_errors(errors, args.min, args.max)
-        audio_seg = get_audio_for_number(number, audio_dir)
+        audio = get_audio_for_number(number, audio_dir)
         total_numbers += 1
+        if total_numbers % STATS_SAVE_INTERVAL == 0:
+            save_errors(errors)
         is_first_try = True
         
         # Play audio and read input in parallel
-        prefill_buffer = read_input_during_playback(audio_seg)
+        prefill_buffer = read_input_during_playback(audio)
         
         while True:
             print(t("controls_hint"))
@@ -321,7 +750,7 @@ def main():
                 return
             
             if user_input.lower() in ('r', 'repeat'):
-                prefill_buffer = read_input_during_playback(audio_seg)
+                prefill_buffer = read_input_during_playback(audio)
                 continue
             
             if user_input.lower() in ('s', 'show'):
@@ -331,6 +760,8 @@ def main():
             
             try:
                 guess = int(user_input)
+                if guess < 0:
+                    raise ValueError(user_input)
                 if guess == number:
                     if is_first_try:
                         first_try_correct += 1
@@ -341,36 +772,8 @@ def main():
                 else:
                     is_first_try = False
                     # Highlight incorrect digits in red and collect errors
-                    correct_str = str(number)
-                    guess_str = str(guess)
-                    highlighted = ""
-                    
-                    # Right-align for position comparison
-                    max_len = max(len(correct_str), len(guess_str))
-                    correct_padded = correct_str.zfill(max_len)
-                    guess_padded = guess_str.zfill(max_len)
-                    
-                    for i, char in enumerate(guess_str):
-                        # Position from end (0 - units, 1 - tens, etc.)
-                        pos_from_end = len(guess_str) - 1 - i
-                        guess_digit = int(char)
-                        
-                        # Check corresponding position in correct number
-                        correct_pos_index = len(correct_padded) - 1 - pos_from_end
-                        if correct_pos_index >= 0:
-                            correct_digit = int(correct_padded[correct_pos_index])
-                        else:
-                            correct_digit = 0
-                        
-                        if guess_digit != correct_digit:
-                            # Red color for incorrect digit
-                            highlighted += f"\033[91m{char}\033[0m"
-                            # Record error - value from target number that was misheard
-                            error_value = correct_digit * (10 ** pos_from_end)
-                            if error_value > 0:  # Don't record zeros
-                                errors[error_value] = errors.get(error_value, 0) + 1
-                        else:
-                            highlighted += char
+                    highlighted, misheard = compare_guess(number, guess)
+                    errors.update(misheard)
                     print(t("incorrect", highlighted=highlighted))
             except ValueError:
                 print(t("enter_valid_number"))
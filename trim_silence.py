@@ -4,62 +4,68 @@ Script for trimming silence at the end of an audio file.
 """
 
 import argparse
+import os
+import re
 import subprocess
-import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 
-def get_audio_duration(file_path: str) -> float:
-    """Gets the duration of an audio file in milliseconds."""
-    result = subprocess.run(
-        [
-            "ffprobe", "-v", "quiet", "-print_format", "json",
-            "-show_format", file_path
-        ],
-        capture_output=True, text=True
-    )
-    data = json.loads(result.stdout)
-    return float(data["format"]["duration"]) * 1000
+BATCH_SIZE = 50  # Files per ffmpeg run in batch mode, keeps open files well under the usual limits
+DEFAULT_JOBS = os.cpu_count() or 1  # Concurrent ffmpeg runs in batch mode
+TAIL_WINDOW_MS = 3000  # Only this much of the end is decoded to find the silence tail
+
+# silencedetect and progress lines in ffmpeg's stderr
+# FFmpeg 6 and older print timestamps with %g, so exponents are allowed
+_SILENCE_RE = re.compile(rb"silence_start:\s*(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)")
+_TIME_RE = re.compile(rb"time=(\d+):(\d+):([\d.]+)")
 
 
-def detect_silence_end(file_path: str, threshold: int) -> float | None:
+def detect_silence_end(file_path: str, threshold: int, window_ms: float | None = None) -> tuple[float | None, float | None]:
     """
-    Finds the start of the last silence segment at the end of the file.
-    Returns time in milliseconds or None if no silence is found.
+    Finds the start of the last silence segment at the end of the file
+    and the duration of the file, both in one decoding pass.
+    With window_ms only the last window_ms of the file are decoded,
+    then both values are relative to the start of that window.
+    Returns (silence start or None if no silence is found, duration or None),
+    both in milliseconds.
     """
+    # Seeking from the end needs no duration, timestamps start from the seek point
+    seek = ["-sseof", f"-{window_ms / 1000:.3f}"] if window_ms else []
     result = subprocess.run(
         [
-            "ffmpeg", "-i", file_path, "-af",
+            "ffmpeg", "-nostdin", *seek, "-i", file_path, "-af",
             f"silencedetect=noise={threshold}dB:d=0.1",
             "-f", "null", "-"
         ],
-        capture_output=True, text=True
+        capture_output=True
     )
     
-    # Parse ffmpeg output to find silence_start
-    lines = result.stderr.split('\n')
-    silence_starts = []
+    # One regex pass over the raw output instead of splitting it into lines
+    silence_starts = _SILENCE_RE.findall(result.stderr)
+    times = _TIME_RE.findall(result.stderr)
     
-    for line in lines:
-        if "silence_start:" in line:
-            try:
-                start_str = line.split("silence_start:")[1].split()[0]
-                silence_starts.append(float(start_str) * 1000)  # to milliseconds
-            except (IndexError, ValueError):
-                continue
+    # The last progress line holds the length of the whole decoded audio
+    duration = None
+    if times:
+        hours, minutes, seconds = times[-1]
+        duration = (int(hours) * 3600 + int(minutes) * 60 + float(seconds)) * 1000
     
     if silence_starts:
-        return silence_starts[-1]  # Last silence segment
-    return None
+        return float(silence_starts[-1]) * 1000, duration  # Last silence segment, to milliseconds
+    return None, duration
 
 
-def trim_audio(input_path: str, output_path: str, end_ms: float) -> None:
-    """Trims audio to the specified point."""
-    end_seconds = end_ms / 1000
+def trim_audio(input_path: str, output_path: str, cut_ms: float) -> None:
+    """
+    Cuts cut_ms milliseconds off the end of audio.
+    The audio is reversed so the end can be cut without knowing the duration.
+    """
+    cut_seconds = cut_ms / 1000
     subprocess.run(
         [
-            "ffmpeg", "-y", "-i", input_path,
-            "-t", str(end_seconds),
+            "ffmpeg", "-nostdin", "-y", "-i", input_path,
+            "-af", f"areverse,atrim=start={cut_seconds:.3f},areverse",
             "-c:a", "libmp3lame", "-q:a", "2",
             output_path
         ],
@@ -67,6 +73,120 @@ def trim_audio(input_path: str, output_path: str, end_ms: float) -> None:
     )
 
 
+def trim_batch(input_paths: list[Path], output_paths: list[Path], threshold: int, tail_ms: int) -> None:
+    """
+    Trims silence at the end of several files with a single ffmpeg run.
+    Every input gets its own chain in one filter graph: the audio is reversed
+    so the tail becomes leading silence for silenceremove, then reversed back.
+    """
+    inputs = []
+    outputs = []
+    chains = []
+    for i, (input_path, output_path) in enumerate(zip(input_paths, output_paths)):
+        inputs += ["-i", str(input_path)]
+        chains.append(
+            f"[{i}:a]areverse,"
+            f"silenceremove=start_periods=1:start_threshold={threshold}dB:start_silence={tail_ms / 1000:.3f},"
+            f"areverse[a{i}]"
+        )
+        outputs += ["-map", f"[a{i}]", "-c:a", "libmp3lame", "-q:a", "2", str(output_path)]
+    
+    subprocess.run(
+        [
+            "ffmpeg", "-nostdin", "-y", "-hide_banner", "-loglevel", "error",
+            *inputs, "-filter_complex", ";".join(chains), *outputs
+        ],
+        capture_output=True, check=True
+    )
+
+
+def process_batch(input_dir: Path, output_dir: Path, threshold: int, tail_ms: int, jobs: int = DEFAULT_JOBS) -> int:
+    """
+    Trims silence at the end of all MP3 files of a directory into another directory,
+    running up to jobs ffmpeg processes at once.
+    """
+    if not input_dir.is_dir():
+        print(f"Error: directory '{input_dir}' not found")
+        return 1
+    if output_dir.resolve() == input_dir.resolve():
+        # ffmpeg can't write into its own inputs
+        print("Error: output directory must differ from the input directory")
+        return 1
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    input_paths = sorted(input_dir.glob("*.mp3"))
+    print(f"Found {len(input_paths)} files to process")
+    
+    # Each chunk is one ffmpeg process, threads only wait for them,
+    # small directories are split so every job gets a share
+    size = max(1, min(BATCH_SIZE, -(-len(input_paths) // jobs)))
+    chunks = [input_paths[start:start + size] for start in range(0, len(input_paths), size)]
+    done = 0
+    failed = 0
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(trim_batch, chunk, [output_dir / path.name for path in chunk], threshold, tail_ms): chunk
+            for chunk in chunks
+        }
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                future.result()
+                done += len(chunk)
+                print(f"✓ Trimmed {done}/{len(input_paths)}")
+            except subprocess.CalledProcessError as e:
+                failed += len(chunk)
+                print(f"✗ Error trimming {chunk[0].name}..{chunk[-1].name}: {e.stderr.decode(errors='ignore').strip()}")
+    
+    print(f"\nDone! Files saved to {output_dir}")
+    return 1 if failed else 0
+
+
+def process_file(input_path: Path, output_path: Path, threshold: int, tail_ms: int) -> int:
+    """
+    Trims silence at the end of a single file, reporting every step.
+    """
+    input_path = str(input_path)
+    output_path = str(output_path)
+    
+    # The silence is at the very end, so decoding the tail window is usually enough
+    silence_start, window = detect_silence_end(input_path, threshold, TAIL_WINDOW_MS)
+    if silence_start is not None and silence_start > 0 and window is not None:
+        silence_duration = window - silence_start
+    else:
+        # No silence in the window or it may start before the window - scan the whole file
+        silence_start, duration = detect_silence_end(input_path, threshold)
+        if duration is None:
+            print(f"Error: could not decode '{input_path}'")
+            return 1
+        print(f"Duration: {duration:.0f} ms")
+        
+        if silence_start is None:
+            print("No silence detected at the end, copying file without changes")
+            subprocess.run(["cp", input_path, output_path])
+            return 0
+        
+        print(f"Silence start: {silence_start:.0f} ms")
+        silence_duration = duration - silence_start
+    
+    print(f"Silence duration: {silence_duration:.0f} ms")
+    
+    if silence_duration <= tail_ms:
+        print(f"Silence ({silence_duration:.0f} ms) does not exceed tail ({tail_ms} ms), copying without changes")
+        subprocess.run(["cp", input_path, output_path])
+        return 0
+    
+    # Keep tail_ms of the silence
+    cut = silence_duration - tail_ms
+    print(f"Trimming: {cut:.0f} ms from the end")
+    
+    trim_audio(input_path, output_path, cut)
+    
+    print(f"✓ Saved: {output_path}")
+    
+    return 0
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Trim silence at the end of an audio file"
@@ -74,12 +194,12 @@ def main():
     parser.add_argument(
         "input",
         type=Path,
-        help="Input MP3 file"
+        help="Input MP3 file (directory with --batch)"
     )
     parser.add_argument(
         "output",
         type=Path,
-        help="Output MP3 file"
+        help="Output MP3 file (directory with --batch)"
     )
     parser.add_argument(
         "-t", "--threshold",
@@ -93,49 +213,32 @@ def main():
         default=500,
         help="Maximum silence tail in milliseconds (default: 500)"
     )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help=f"Trim all MP3 files of the input directory, up to {BATCH_SIZE} files per ffmpeg run"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Number of concurrent ffmpeg runs with --batch (default: {DEFAULT_JOBS})"
+    )
     
     args = parser.parse_args()
     
-    if not args.input.exists():
-        print(f"Error: file '{args.input}' not found")
+    if args.jobs < 1:
+        print(f"Error: --jobs ({args.jobs}) must be at least 1")
         return 1
     
-    input_path = str(args.input)
-    output_path = str(args.output)
-    
-    # Get audio duration
-    duration = get_audio_duration(input_path)
-    print(f"Duration: {duration:.0f} ms")
-    
-    # Find the start of silence at the end
-    silence_start = detect_silence_end(input_path, args.threshold)
+    if args.batch:
+        return process_batch(args.input, args.output, args.threshold, args.tail, args.jobs)
     
-    if silence_start is None:
-        print("No silence detected at the end, copying file without changes")
-        subprocess.run(["cp", input_path, output_path])
-        return 0
-    
-    print(f"Silence start: {silence_start:.0f} ms")
-    
-    silence_duration = duration - silence_start
-    print(f"Silence duration: {silence_duration:.0f} ms")
-    
-    if silence_duration <= args.tail:
-        print(f"Silence ({silence_duration:.0f} ms) does not exceed tail ({args.tail} ms), copying without changes")
-        subprocess.run(["cp", input_path, output_path])
-        return 0
-    
-    # Trim to silence_start + tail
-    trim_point = silence_start + args.tail
-    print(f"Trimming to: {trim_point:.0f} ms")
-    
-    trim_audio(input_path, output_path, trim_point)
-    
-    new_duration = get_audio_duration(output_path)
-    print(f"New duration: {new_duration:.0f} ms")
-    print(f"✓ Saved: {output_path}")
+    if not args.input.exists():
+        print(f"Error: file '{args.input}' not found")
+        return 1
     
-    return 0
+    return process_file(args.input, args.output, args.threshold, args.tail)
 
 
 if __name__ == "__main__":